@@ -8,14 +8,24 @@ strategies on a daily basis with precise mark-to-market P/L calculations.
 __version__ = "1.0.0"
 
 from .engine import BacktestEngine
-from .instruments import OptionPosition, StockPosition
+from .instruments import (
+    OptionBook,
+    OptionPosition,
+    StockPosition,
+    black_scholes_greeks_batch,
+    black_scholes_price_batch,
+)
 from .data import DataManager
-from .metrics import calculate_metrics
+from .metrics import calculate_metrics, calculate_metrics_arrays
 
 __all__ = [
     "BacktestEngine",
     "OptionPosition",
+    "OptionBook",
     "StockPosition",
+    "black_scholes_price_batch",
+    "black_scholes_greeks_batch",
     "DataManager",
     "calculate_metrics",
+    "calculate_metrics_arrays",
 ]
@@ -0,0 +1,36 @@
+"""
+Ahead-of-time build of the compiled pricing kernels.
+
+Numba compiles the JIT kernels in ``_kernels`` on their first call, which a
+one-shot CLI run pays in full.  Running this module (for example as a wheel
+build step)::
+
+    python -m backtester._aot_build
+
+compiles the float64 kernels into the ``backtester._bs_aot`` extension, which
+``_kernels`` picks up when present.  The extension needs only NumPy at run
+time.  Ahead-of-time code cannot use ``parallel=True``, so the exported
+kernels run single-threaded.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from backtester._kernels import bs_mtm, bs_mtm_const_rq
+
+cc = CC('_bs_aot')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export(
+    'bs_mtm',
+    'f8[:,:](f8[:], f8[:], f8[:,:], f8[:], f8, f8[:], b1[:], f8[:], f8[:], f8[:,:])'
+)(bs_mtm.py_func)
+cc.export(
+    'bs_mtm_const_rq',
+    'f8[:,:](f8[:], f8[:], f8[:,:], f8, f8, f8[:], b1[:], f8[:], f8[:], f8[:,:])'
+)(bs_mtm_const_rq.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
@@ -0,0 +1,534 @@
+"""
+Compiled numeric kernels for option mark-to-market.
+
+Kernels are written as explicit loops and compiled with Numba when it is
+installed. Without Numba the decorators below are no-ops, so the module still
+imports and the engine falls back to its NumPy pricing path.  When the
+ahead-of-time build from ``_aot_build`` is present it is used for float64
+grids, skipping the JIT compile entirely.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except Exception:  # pragma: no cover - numba might not be installed
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for :func:`numba.njit` that leaves the function untouched."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    from . import _bs_aot
+except ImportError:  # pragma: no cover - only present after running _aot_build
+    _bs_aot = None
+
+
+# Every fast-math flag except 'nnan'/'ninf': zero volatility legitimately
+# sends d1 to +/-inf and the CDF must still saturate to 0 or 1.
+FASTMATH = {'contract', 'arcp', 'nsz', 'afn', 'reassoc'}
+
+SQRT1_2 = math.sqrt(0.5)
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+@njit(inline='always', fastmath=FASTMATH)
+def _ncdf(x):
+    """Standard normal CDF, inlined into each pricing loop.
+
+    Uses erfc rather than ``1 + erf``, which keeps full relative precision in
+    the left tail where deep out-of-the-money legs live.  A truncated
+    polynomial (Abramowitz-Stegun 7.1.26) was not used: its ~1e-7 absolute
+    error is visible in P/L once multiplied by contract size.
+    """
+    return 0.5 * math.erfc(-x * SQRT1_2)
+
+
+@njit(inline='always')
+def _div(num, den):
+    """``num / den`` with NumPy's result for a zero denominator (+/-inf, or NaN for 0/0).
+
+    Plain Python and Numba's default error model raise ZeroDivisionError
+    instead, which zero volatility would trigger on the scalar path.
+    """
+    if den == 0.0:
+        return num * math.inf if num != 0.0 else math.nan
+    return num / den
+
+
+@njit(inline='always')
+def _log(x):
+    """``math.log`` with NumPy's result outside its domain (-inf at zero, NaN below).
+
+    Plain Python raises ValueError there instead, which a zero spot would
+    trigger on the scalar path.
+    """
+    if x > 0.0:
+        return math.log(x)
+    return -math.inf if x == 0.0 else math.nan
+
+
+@njit(inline='always', fastmath=FASTMATH)
+def _bs_terms(S, K, T, sigma, r, q):
+    """Intermediates shared by the price and every greek of one option (T > 0).
+
+    Returns:
+        ``(d1, d2, sqrt_T, S_fwd, K_disc)`` where ``S_fwd = S*exp(-qT)`` and
+        ``K_disc = K*exp(-rT)``
+    """
+    sqrt_T = math.sqrt(T)
+    sig_sqrt_T = sigma * sqrt_T
+    d1 = _div(_log(S / K) + (r - q + 0.5 * sigma * sigma) * T, sig_sqrt_T)
+    d2 = d1 - sig_sqrt_T
+    return d1, d2, sqrt_T, S * math.exp(-q * T), K * math.exp(-r * T)
+
+
+@njit(cache=True, fastmath=FASTMATH)
+def _bs_price(S, K, T, sigma, r, q, is_call):
+    """Black-Scholes-Merton price of a single option; intrinsic value once T <= 0."""
+    if T <= 0.0:
+        if is_call:
+            return max(S - K, 0.0)
+        return max(K - S, 0.0)
+
+    d1, d2, sqrt_T, S_fwd, K_disc = _bs_terms(S, K, T, sigma, r, q)
+
+    if is_call:
+        return S_fwd * _ncdf(d1) - K_disc * _ncdf(d2)
+    return K_disc * _ncdf(-d2) - S_fwd * _ncdf(-d1)
+
+
+@njit(cache=True, fastmath=FASTMATH)
+def _bs_greeks(S, K, T, sigma, r, q, is_call):
+    """Price and greeks of a single option from one set of intermediates.
+
+    ``d1``, ``d2``, the two CDF values and the density at ``d1`` are each
+    evaluated once and shared by all five outputs.  Theta is per year.
+
+    Returns:
+        ``(price, delta, gamma, vega, theta)``
+    """
+    sign = 1.0 if is_call else -1.0
+    if T <= 0.0:
+        payoff = max(sign * (S - K), 0.0)
+        return payoff, sign if payoff > 0.0 else 0.0, 0.0, 0.0, 0.0
+
+    d1, d2, sqrt_T, S_fwd, K_disc = _bs_terms(S, K, T, sigma, r, q)
+    N1 = _ncdf(sign * d1)
+    N2 = _ncdf(sign * d2)
+    pdf_d1 = math.exp(-0.5 * d1 * d1) * INV_SQRT_2PI
+
+    S_fwd_N1 = S_fwd * N1
+    S_fwd_pdf = S_fwd * pdf_d1
+
+    price = sign * (S_fwd_N1 - K_disc * N2)
+    delta = _div(sign * S_fwd_N1, S)
+    gamma = _div(S_fwd_pdf, S * S * sigma * sqrt_T)
+    vega = S_fwd_pdf * sqrt_T
+    theta = -S_fwd_pdf * sigma / (2.0 * sqrt_T) - sign * (r * K_disc * N2 - q * S_fwd_N1)
+    return price, delta, gamma, vega, theta
+
+
+@njit(cache=True, parallel=True, fastmath=FASTMATH)
+def bs_price_chain(S, K, T, sigma, r, q, is_call, out):
+    """
+    Price a chain of independent options, one per array slot, in parallel.
+
+    Args:
+        S: Stock price, shape (M,)
+        K: Strike price, shape (M,)
+        T: Time to expiry in years, shape (M,)
+        sigma: Annualized volatility, shape (M,)
+        r: Risk-free rate, shape (M,)
+        q: Dividend yield, shape (M,)
+        is_call: True for calls, False for puts, shape (M,)
+        out: Output buffer, shape (M,)
+
+    Returns:
+        ``out``, filled with option prices
+    """
+    for j in prange(out.shape[0]):
+        out[j] = _bs_price(S[j], K[j], T[j], sigma[j], r[j], q[j], is_call[j])
+    return out
+
+
+@njit(cache=True, parallel=True, fastmath=FASTMATH)
+def bs_mtm(prices, strikes, Ts, rs, q, vols, is_call, sides_sign, qtys, out):
+    """
+    Mark every (day, leg) cell of an option book to market.
+
+    The parallel loop runs over the flattened day-by-leg grid rather than over
+    days alone, so a short backtest of a wide book (ladders, butterflies,
+    calendars) still spreads across every core.  Each cell writes only its own
+    slot of ``out``; there is no cross-thread reduction.
+
+    Args:
+        prices: Stock price per day, shape (N,)
+        strikes: Strike per leg, shape (K,)
+        Ts: Time to expiry in years, shape (N, K)
+        rs: Risk-free rate per day, shape (N,)
+        q: Dividend yield
+        vols: Annualized volatility per day, shape (N,)
+        is_call: True for calls, False for puts, shape (K,)
+        sides_sign: +1.0 for long legs, -1.0 for short legs, shape (K,)
+        qtys: Position size per leg in shares, shape (K,)
+        out: Output buffer, shape (N, K)
+
+    Returns:
+        ``out``, filled with signed position values
+    """
+    n_days, n_legs = Ts.shape
+    for cell in prange(n_days * n_legs):
+        i = cell // n_legs
+        k = cell - i * n_legs
+        price = _bs_price(prices[i], strikes[k], Ts[i, k], vols[i], rs[i], q, is_call[k])
+        out[i, k] = sides_sign[k] * qtys[k] * price
+    return out
+
+
+@njit(cache=True, parallel=True, fastmath=FASTMATH)
+def bs_mtm_const_rq(prices, strikes, Ts, r, q, vols, is_call, sides_sign, qtys, out):
+    """
+    Variant of :func:`bs_mtm` for a constant risk-free rate and dividend yield.
+
+    With ``r`` and ``q`` scalars the per-day rate gather disappears, and when
+    ``q`` is zero (the usual case) the ``exp(-q*T)`` factor is skipped
+    entirely, saving one transcendental per cell.
+
+    Args:
+        prices: Stock price per day, shape (N,)
+        strikes: Strike per leg, shape (K,)
+        Ts: Time to expiry in years, shape (N, K)
+        r: Risk-free rate
+        q: Dividend yield
+        vols: Annualized volatility per day, shape (N,)
+        is_call: True for calls, False for puts, shape (K,)
+        sides_sign: +1.0 for long legs, -1.0 for short legs, shape (K,)
+        qtys: Position size per leg in shares, shape (K,)
+        out: Output buffer, shape (N, K)
+
+    Returns:
+        ``out``, filled with signed position values
+    """
+    n_days, n_legs = Ts.shape
+    no_dividend = q == 0.0
+    carry = r - q
+    for cell in prange(n_days * n_legs):
+        i = cell // n_legs
+        k = cell - i * n_legs
+        S = prices[i]
+        K = strikes[k]
+        T = Ts[i, k]
+
+        if T <= 0.0:
+            if is_call[k]:
+                price = max(S - K, 0.0)
+            else:
+                price = max(K - S, 0.0)
+        else:
+            sigma = vols[i]
+            sig_sqrt_T = sigma * math.sqrt(T)
+            d1 = (math.log(S / K) + (carry + 0.5 * sigma * sigma) * T) / sig_sqrt_T
+            d2 = d1 - sig_sqrt_T
+            S_fwd = S if no_dividend else S * math.exp(-q * T)
+            K_disc = K * math.exp(-r * T)
+            if is_call[k]:
+                price = S_fwd * _ncdf(d1) - K_disc * _ncdf(d2)
+            else:
+                price = K_disc * _ncdf(-d2) - S_fwd * _ncdf(-d1)
+
+        out[i, k] = sides_sign[k] * qtys[k] * price
+    return out
+
+
+@njit(inline='always')
+def _first_ge(values, start, level):
+    """Index of the first ``values[i] >= level`` with ``i >= start``, or -1.
+
+    Stops at the first hit, so the cost is the distance scanned rather than
+    the length of the array, and nothing is allocated.
+    """
+    for i in range(start, values.shape[0]):
+        if values[i] >= level:
+            return i
+    return -1
+
+
+@njit(cache=True, error_model='numpy')
+def drawdown_scan(pl):
+    """
+    Drawdown statistics of a P/L series in one sequential pass.
+
+    Equity is the running sum of ``pl`` and drawdown is
+    ``(equity - peak) / peak * 100`` against the running peak.  As in pandas,
+    NaN entries are skipped by the running sum, the peak and every statistic.
+
+    Args:
+        pl: Daily P/L values, shape (N,)
+
+    Returns:
+        Tuple of (max_drawdown, max_drawdown_idx, avg_drawdown, recovery_idx,
+        period_starts, period_ends, period_mins).  Indices are -1 when absent;
+        a period ends on the first day back at its peak, or on the last day.
+    """
+    n = pl.shape[0]
+    equity = np.empty(n)
+    starts = np.empty(n // 2 + 1, dtype=np.int64)
+    ends = np.empty(n // 2 + 1, dtype=np.int64)
+    mins = np.empty(n // 2 + 1)
+    n_periods = 0
+    in_drawdown = False
+
+    cum = 0.0
+    peak = -np.inf
+    max_dd = np.nan
+    max_idx = -1
+    max_peak = np.nan
+    neg_sum = 0.0
+    neg_count = 0
+
+    for i in range(n):
+        if math.isnan(pl[i]):
+            equity[i] = np.nan
+            continue
+        cum += pl[i]
+        equity[i] = cum
+        if cum > peak:
+            peak = cum
+
+        dd = (cum - peak) / peak * 100.0
+        if math.isnan(dd):
+            continue
+        if max_idx < 0 or dd < max_dd:
+            max_dd = dd
+            max_idx = i
+            max_peak = peak
+
+        if dd < 0.0:
+            neg_sum += dd
+            neg_count += 1
+            if not in_drawdown:
+                in_drawdown = True
+                starts[n_periods] = i
+                mins[n_periods] = dd
+            elif dd < mins[n_periods]:
+                mins[n_periods] = dd
+        elif in_drawdown:
+            in_drawdown = False
+            ends[n_periods] = i
+            n_periods += 1
+
+    if in_drawdown:
+        ends[n_periods] = n - 1
+        n_periods += 1
+
+    # First day after the deepest trough with equity back at its prior peak
+    recovery_idx = -1
+    if max_idx >= 0 and max_dd < 0.0:
+        recovery_idx = _first_ge(equity, max_idx + 1, max_peak)
+
+    avg_dd = neg_sum / neg_count if neg_count > 0 else 0.0
+    return max_dd, max_idx, avg_dd, recovery_idx, starts[:n_periods], ends[:n_periods], mins[:n_periods]
+
+
+@njit(cache=True)
+def rolling_mean_std(x, window):
+    """
+    Rolling mean and sample standard deviation (ddof=1) in one online pass.
+
+    Welford's update is applied as each value enters the window and reversed
+    as it leaves, so the cost is O(N) whatever the window.  As with pandas
+    ``rolling(window)``, a window holding any NaN yields NaN.
+
+    Args:
+        x: Input values, shape (N,)
+        window: Window length
+
+    Returns:
+        Tuple of (mean, std) arrays, shape (N,)
+    """
+    n = x.shape[0]
+    mean_out = np.full(n, np.nan)
+    std_out = np.full(n, np.nan)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+
+    for i in range(n):
+        v = x[i]
+        if not math.isnan(v):
+            count += 1
+            d = v - mean
+            mean += d / count
+            m2 += d * (v - mean)
+
+        if i >= window:
+            u = x[i - window]
+            if not math.isnan(u):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    d = u - mean
+                    mean -= d / count
+                    m2 -= d * (u - mean)
+
+        if count == window:
+            mean_out[i] = mean
+            if window > 1:
+                std_out[i] = math.sqrt(max(m2, 0.0) / (window - 1))
+
+    return mean_out, std_out
+
+
+@njit(cache=True)
+def rolling_max(x, window):
+    """
+    Rolling maximum with a monotonic deque, O(N) whatever the window.
+
+    Args:
+        x: Input values, shape (N,)
+        window: Window length
+
+    Returns:
+        Window maxima, shape (N,); NaN until a full window and wherever the
+        window holds a NaN, as with pandas ``rolling(window).max()``
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    deque = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    nan_count = 0
+
+    for i in range(n):
+        if math.isnan(x[i]):
+            nan_count += 1
+        else:
+            while tail > head and x[deque[tail - 1]] <= x[i]:
+                tail -= 1
+            deque[tail] = i
+            tail += 1
+
+        if i >= window and math.isnan(x[i - window]):
+            nan_count -= 1
+        while tail > head and deque[head] <= i - window:
+            head += 1
+
+        if i >= window - 1 and nan_count == 0:
+            out[i] = x[deque[head]]
+
+    return out
+
+
+@njit(cache=True)
+def paired_moments(x, y):
+    """
+    Means and central co-moments of two series in one numerically stable pass.
+
+    Uses Welford's update extended to the cross term; pairs where either
+    value is NaN are skipped.
+
+    Args:
+        x: First series, shape (N,)
+        y: Second series, shape (N,)
+
+    Returns:
+        Tuple of (n, mean_x, mean_y, m2_x, m2_y, c_xy), where the m2 terms
+        are sums of squared deviations and c_xy the sum of cross deviations
+    """
+    n = 0
+    mean_x = 0.0
+    mean_y = 0.0
+    m2_x = 0.0
+    m2_y = 0.0
+    c_xy = 0.0
+
+    for i in range(x.shape[0]):
+        if math.isnan(x[i]) or math.isnan(y[i]):
+            continue
+        n += 1
+        dx = x[i] - mean_x
+        dy = y[i] - mean_y
+        mean_x += dx / n
+        mean_y += dy / n
+        m2_x += dx * (x[i] - mean_x)
+        m2_y += dy * (y[i] - mean_y)
+        c_xy += dx * (y[i] - mean_y)
+
+    if n == 0:
+        mean_x = np.nan
+        mean_y = np.nan
+    return n, mean_x, mean_y, m2_x, m2_y, c_xy
+
+
+@njit(cache=True)
+def return_moments(x):
+    """
+    Moments of a return series and of its losing days in one stable pass.
+
+    Feeds volatility, Sharpe and Sortino from a single loop instead of
+    separate mean, std, downside filter and downside std reductions.
+
+    Args:
+        x: Returns, shape (N,)
+
+    Returns:
+        Tuple of (n, mean, m2, n_down, mean_down, m2_down, min_x), where the
+        m2 terms are sums of squared deviations over all returns and over the
+        negative ones; min_x is NaN if any return is NaN, as ``np.min`` gives
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    n_down = 0
+    mean_down = 0.0
+    m2_down = 0.0
+    min_x = np.inf
+
+    for i in range(x.shape[0]):
+        v = x[i]
+        n += 1
+        d = v - mean
+        mean += d / n
+        m2 += d * (v - mean)
+        if v < 0.0:
+            n_down += 1
+            d = v - mean_down
+            mean_down += d / n_down
+            m2_down += d * (v - mean_down)
+        if v < min_x or math.isnan(v):
+            if not math.isnan(min_x):
+                min_x = v
+
+    if n == 0:
+        mean = np.nan
+        min_x = np.nan
+    if n_down == 0:
+        mean_down = np.nan
+    return n, mean, m2, n_down, mean_down, m2_down, min_x
+
+
+def mtm_kernels(dtype):
+    """
+    Pick the compiled MTM kernels for a pricing grid of the given dtype.
+
+    Args:
+        dtype: Floating-point dtype of the grid
+
+    Returns:
+        ``(bs_mtm, bs_mtm_const_rq)``, or None when no compiled kernel exists
+    """
+    if _bs_aot is not None and dtype == np.float64:
+        return _bs_aot.bs_mtm, _bs_aot.bs_mtm_const_rq
+    if NUMBA_AVAILABLE:
+        return bs_mtm, bs_mtm_const_rq
+    return None
@@ -1,3 +1,7 @@
+import hashlib
+import os
+from typing import Optional
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -7,6 +11,9 @@ try:
 except Exception:  # pragma: no cover - yfinance might not be installed
     yf = None
 
+#: Default location of the on-disk price cache.
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "backtester")
+
 
 class DataManager:
     """Utility class for fetching market data and simple analytics.
@@ -17,8 +24,48 @@ class DataManager:
     Risk‑free rates and dividend yields are returned as simple constants so
     that the rest of the backtesting engine can operate without external
     dependencies.
+
+    Downloaded prices are cached as Parquet files keyed on the ticker and
+    date range, so repeat backtests over the same range skip the network.
+    Only closed ranges are cached: a range ending today or later would
+    freeze prices at the download date, and an empty download is not kept.
     """
 
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """Create a data manager.
+
+        Parameters
+        ----------
+        cache_dir: str, optional
+            Directory for cached downloads.  ``None`` disables caching.
+        """
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, ticker: str, start_date: str, end_date: str) -> Optional[str]:
+        """Return the cache file for a download, or ``None`` if caching is off."""
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha1(f"{ticker}|{start_date}|{end_date}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _is_cacheable(self, data: pd.DataFrame, end_date: str) -> bool:
+        """Whether a download is final: the range has ended and prices came back."""
+        if pd.Timestamp(end_date) >= pd.Timestamp.today().normalize():
+            return False
+        return bool(data["Adj_Close"].notna().to_numpy().any())
+
+    def _write_cache(self, data: pd.DataFrame, path: Optional[str]) -> None:
+        """Store *data* at *path*; caching is best effort and never fails a fetch."""
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            data.to_parquet(tmp_path, compression="zstd")
+            os.replace(tmp_path, path)
+        except Exception:  # pragma: no cover - e.g. no parquet engine installed
+            pass
+
     def get_stock_data(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
         """Return adjusted close prices for *ticker*.
 
@@ -30,17 +77,26 @@ class DataManager:
             Date range in ``YYYY-MM-DD`` format.
         """
         dates = pd.date_range(start_date, end_date, freq="B")
+        cache_path = self._cache_path(ticker, start_date, end_date)
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                return pd.read_parquet(cache_path).reindex(dates)
+            except Exception:
+                pass  # unreadable cache entry, download again
+
         if yf is not None:
             try:
                 data = yf.download(ticker, start=start_date, end=end_date, progress=False)
                 data = data[["Adj Close"]].rename(columns={"Adj Close": "Adj_Close"})
+                if self._is_cacheable(data, end_date):
+                    self._write_cache(data, cache_path)
                 return data.reindex(dates)
             except Exception:
                 pass  # fall back to synthetic data
 
         # Fallback: generate a simple price series so tests can run without IO.
-        prices = pd.Series(100 + np.linspace(0, 1, len(dates)), index=dates)
-        return pd.DataFrame({"Adj_Close": prices})
+        prices = 100.0 + np.linspace(0.0, 1.0, len(dates))
+        return pd.DataFrame({"Adj_Close": prices}, index=dates, copy=False)
 
     def get_risk_free_rate(self, start_date: str, end_date: str) -> pd.Series:
         """Return a constant daily risk-free rate series.
@@ -52,11 +108,54 @@ class DataManager:
         dates = pd.date_range(start_date, end_date, freq="B")
         return pd.Series(0.02, index=dates)
 
-    def calculate_historical_volatility(self, stock_data: pd.DataFrame, window: int = 30) -> pd.Series:
-        """Compute annualised rolling volatility from price data."""
-        returns = np.log(stock_data["Adj_Close"]).diff()
-        vol = returns.rolling(window=window).std() * np.sqrt(252)
-        return vol.fillna(method="bfill")
+    def calculate_historical_volatility(self, stock_data: pd.DataFrame, window: int = 30,
+                                        as_array: bool = False):
+        """Compute annualised rolling volatility from price data.
+
+        Window sums of log returns and of their squares are taken from running
+        totals, so the whole series costs a single O(N) pass.  As with
+        ``pandas.Series.rolling``, a window containing a missing return is NaN.
+
+        Parameters
+        ----------
+        stock_data: pandas.DataFrame
+            Frame with an ``Adj_Close`` column.
+        window: int
+            Rolling window length in days.
+        as_array: bool
+            Return a plain ``numpy.ndarray`` aligned to ``stock_data.index``
+            instead of a Series, for callers that only do array arithmetic.
+        """
+        prices = stock_data["Adj_Close"].to_numpy(dtype=np.float64)
+        n = len(prices)
+        vol = np.full(n, np.nan)
+
+        returns = np.full(n, np.nan)
+        returns[1:] = np.diff(np.log(prices))
+        valid = ~np.isnan(returns)
+
+        if window > 1 and n >= window and valid.any():
+            # Variance is shift-invariant; centring first keeps the
+            # sum-of-squares difference from cancelling catastrophically.
+            centred = np.where(valid, returns - returns[valid].mean(), 0.0)
+            c = np.concatenate(([0.0], np.cumsum(centred)))
+            c2 = np.concatenate(([0.0], np.cumsum(centred * centred)))
+            count = np.concatenate(([0], np.cumsum(valid)))
+
+            s = c[window:] - c[:-window]
+            ss = c2[window:] - c2[:-window]
+            full = (count[window:] - count[:-window]) == window
+            var = np.maximum((ss - s * s / window) / (window - 1), 0.0)
+            vol[window - 1:] = np.where(full, np.sqrt(var) * np.sqrt(252), np.nan)
+
+        # Back-fill the warm-up period from the first complete window
+        next_valid = np.where(np.isnan(vol), n, np.arange(n))
+        next_valid = np.minimum.accumulate(next_valid[::-1])[::-1]
+        vol = np.append(vol, np.nan)[next_valid]
+
+        if as_array:
+            return vol
+        return pd.Series(vol, index=stock_data.index)
 
     def get_dividend_yield(self, ticker: str, start_date: str, end_date: str) -> float:
         """Return a placeholder dividend yield.
@@ -12,7 +12,57 @@ import json
 import os
 
 from .data import DataManager
-from .instruments import OptionPosition, StockPosition
+from .instruments import (
+    NS_PER_YEAR, OptionBook, OptionPosition, StockPosition, _parse_date, black_scholes_price_batch
+)
+from ._kernels import mtm_kernels
+
+
+def _ffill_align(series: pd.Series, day_ns: np.ndarray) -> np.ndarray:
+    """
+    Forward-fill a series onto a calendar with a single searchsorted gather.
+    
+    Each date takes the last observation on or before it; dates before the
+    first observation take the first one.
+    
+    Args:
+        series: Date-indexed series (NaNs are treated as missing)
+        day_ns: Target calendar as int64 nanoseconds
+    
+    Returns:
+        Float64 array aligned to day_ns
+    """
+    src = series.dropna()
+    if src.empty:
+        return np.full(len(day_ns), np.nan)
+    if not src.index.is_monotonic_increasing:
+        src = src.sort_index()
+    
+    src_ns = src.index.values.astype('datetime64[ns]').view(np.int64)
+    pos = np.searchsorted(src_ns, day_ns, side='right') - 1
+    
+    return src.to_numpy(dtype=np.float64)[np.clip(pos, 0, len(src) - 1)]
+
+
+def _ffill_array(values: np.ndarray) -> np.ndarray:
+    """
+    Forward-fill NaNs in an array already aligned to the calendar.
+    
+    Leading NaNs take the first valid value, matching _ffill_align.
+    
+    Args:
+        values: Float array, one entry per trading day
+    
+    Returns:
+        Filled float64 array
+    """
+    valid = ~np.isnan(values)
+    if valid.all() or not valid.any():
+        return values
+    
+    pos = np.maximum.accumulate(np.where(valid, np.arange(len(values)), np.argmax(valid)))
+    
+    return values[pos]
 
 
 class BacktestEngine:
@@ -41,15 +91,17 @@ class BacktestEngine:
         self.start_date = self.config.get('start_date')
         self.end_date = self.config.get('end_date')
         
+        # Floating-point precision of the option pricing grid
+        self.engine_dtype = np.dtype(self.config.get('engine_dtype', 'float64'))
+        
+        # Results storage (filled lazily by run_backtest)
+        self._results_df = None
+        
         # Initialize positions
         self.stock_position = None
         self.option_positions = []
         self._initialize_positions()
         
-        # Results storage
-        self.equity_curve = []
-        self.daily_pl = []
-        
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from JSON file."""
         with open(config_path, 'r') as f:
@@ -61,24 +113,31 @@ class BacktestEngine:
             if field not in config:
                 raise ValueError(f"Missing required field: {field}")
         
+        if config.get('engine_dtype', 'float64') not in ['float64', 'float32']:
+            raise ValueError("engine_dtype must be 'float64' or 'float32'")
+        
         return config
     
     def _initialize_positions(self):
         """Initialize stock and option positions from configuration."""
+        # Positions are (re)built from the config, so cached results are stale
+        self._results_df = None
+        
         # Determine date range if not specified
         if not self.start_date or not self.end_date:
             self._determine_date_range()
         
-        # Get initial stock price
-        stock_data = self.data_manager.get_stock_data(
-            self.ticker, self.start_date, self.start_date
+        # Fetch prices for the whole range once; run_backtest reuses them
+        self._stock_data = self.data_manager.get_stock_data(
+            self.ticker, self.start_date, self.end_date
         )
-        initial_price = stock_data['Adj_Close'].iloc[0]
+        initial_price = self._stock_data['Adj_Close'].iloc[0]
         
         # Initialize stock position
         self.stock_position = StockPosition(self.ticker, self.share_qty, initial_price)
         
-        # Initialize option positions
+        # Initialize option positions, laid out as arrays in an option book
+        self.option_book = OptionBook(len(self.legs))
         for leg in self.legs:
             option = OptionPosition(
                 side=leg['side'],
@@ -90,106 +149,182 @@ class BacktestEngine:
                 expiry=leg['expiry']
             )
             self.option_positions.append(option)
+            self.option_book.add(option)
     
     def _determine_date_range(self):
         """Determine start and end dates from option legs."""
-        trade_dates = [pd.to_datetime(leg['trade_date']) for leg in self.legs]
-        expiry_dates = [pd.to_datetime(leg['expiry']) for leg in self.legs]
+        trade_dates = [_parse_date(leg['trade_date']) for leg in self.legs]
+        expiry_dates = [_parse_date(leg['expiry']) for leg in self.legs]
         
         self.start_date = min(trade_dates).strftime('%Y-%m-%d')
         self.end_date = max(expiry_dates).strftime('%Y-%m-%d')
     
-    def run_backtest(self) -> pd.DataFrame:
+    def _align_market_data(self, stock_data: pd.DataFrame, risk_free_rates: pd.Series,
+                           volatility: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Align prices, rates and volatility to the trading calendar.
+        
+        This is the only place the pricing path touches pandas: the calendar
+        becomes an int64 nanosecond array and each series is gathered once,
+        so everything downstream strides over plain arrays by day position.
+        
+        Args:
+            stock_data: DataFrame with Adj_Close column, indexed by trading day
+            risk_free_rates: Risk-free rate series
+            volatility: Annualized volatility array, one entry per stock_data row
+        
+        Returns:
+            Tuple of (day_ns, prices, risk_free_rates, volatility) arrays
+        """
+        day_ns = stock_data.index.values.astype('datetime64[ns]').view(np.int64)
+        prices = stock_data['Adj_Close'].ffill().to_numpy(dtype=np.float64)
+        rf = _ffill_align(risk_free_rates, day_ns)
+        vol = _ffill_array(volatility)
+        
+        return day_ns, prices, rf, vol
+    
+    def _price_legs(self, legs: Dict[str, np.ndarray], day_ns: np.ndarray, prices: np.ndarray,
+                    rf: np.ndarray, vol: np.ndarray, dividend_yield: float) -> np.ndarray:
+        """
+        Mark every (day, leg) cell of the option book to market.
+        
+        Pricing runs in the configured engine_dtype; with 'float32' the grid
+        takes half the memory bandwidth and twice the SIMD lanes. Values come
+        back as float64 so P/L accumulation does not drift over long horizons.
+        
+        Args:
+            legs: Leg arrays from OptionBook.arrays
+            day_ns: Trading calendar as int64 nanoseconds
+            prices: Stock price per day
+            rf: Risk-free rate per day
+            vol: Annualized volatility per day
+            dividend_yield: Dividend yield
+        
+        Returns:
+            Signed position values, shape (days, legs)
+        """
+        dtype = self.engine_dtype
+        n_days = len(day_ns)
+        shares = legs['mult'].astype(dtype)
+        strikes = legs['strikes'].astype(dtype)
+        prices = prices.astype(dtype, copy=False)
+        vol = vol.astype(dtype, copy=False)
+        
+        # Calculate time to expiry: one broadcast integer subtract and scale
+        time_to_expiry = np.maximum((legs['expiries'][None, :] - day_ns[:, None]) * (1.0 / NS_PER_YEAR), 0.0)
+        time_to_expiry = time_to_expiry.astype(dtype, copy=False)
+        
+        # Compiled kernels (ahead-of-time build or Numba JIT), if any
+        bs_mtm, bs_mtm_const_rq = mtm_kernels(dtype) or (None, None)
+        
+        if bs_mtm is not None and n_days > 0 and np.all(rf == rf[0]):
+            # Compiled kernel specialised for a flat rate curve
+            option_value = bs_mtm_const_rq(
+                prices, strikes, time_to_expiry, float(rf[0]), dividend_yield, vol,
+                legs['is_call'], np.ones_like(shares), shares,
+                np.empty(time_to_expiry.shape, dtype=dtype)
+            )
+        elif bs_mtm is not None:
+            # Compiled kernel: one fused pass over the grid
+            option_value = bs_mtm(
+                prices, strikes, time_to_expiry, rf.astype(dtype), dividend_yield, vol,
+                legs['is_call'], np.ones_like(shares), shares,
+                np.empty(time_to_expiry.shape, dtype=dtype)
+            )
+        else:
+            # Legs sharing a strike or an expiry (e.g. a synthetic long) share
+            # their log(S/K) and sqrt(T) columns, computed once per distinct value
+            unique_strikes, strike_col = np.unique(strikes, return_inverse=True)
+            log_moneyness = np.log(prices[:, None] / unique_strikes[None, :])[:, strike_col.ravel()]
+            _, expiry_first, expiry_col = np.unique(legs['expiries'], return_index=True, return_inverse=True)
+            sqrt_T = np.sqrt(time_to_expiry[:, expiry_first])[:, expiry_col.ravel()]
+            
+            option_value = shares * black_scholes_price_batch(
+                prices[:, None], strikes[None, :], time_to_expiry, vol[:, None],
+                rf.astype(dtype)[:, None], dividend_yield, legs['is_call'][None, :],
+                log_moneyness=log_moneyness, sqrt_T=sqrt_T
+            )
+        
+        return option_value.astype(np.float64, copy=False)
+    
+    def run_backtest(self, force: bool = False) -> pd.DataFrame:
         """
         Run the complete backtest.
         
+        The result is cached on the engine, so save_results, print_summary and
+        repeated calls share a single run.
+        
+        Args:
+            force: Re-run even if cached results are available
+        
         Returns:
             DataFrame with daily equity curve and P/L data
         """
+        if self._results_df is not None and not force:
+            return self._results_df
+        
         print(f"Running backtest for {self.ticker} from {self.start_date} to {self.end_date}")
         
-        # Download data
-        stock_data = self.data_manager.get_stock_data(self.ticker, self.start_date, self.end_date)
+        # Market data (prices were fetched in _initialize_positions)
+        stock_data = self._stock_data
         risk_free_rates = self.data_manager.get_risk_free_rate(self.start_date, self.end_date)
-        volatility = self.data_manager.calculate_historical_volatility(stock_data)
+        volatility = self.data_manager.calculate_historical_volatility(stock_data, as_array=True)
         dividend_yield = self.data_manager.get_dividend_yield(self.ticker, self.start_date, self.end_date)
         
-        # Initialize tracking variables
-        previous_stock_value = 0.0
-        previous_option_value = 0.0
+        # Align market data to the trading calendar once, up front
+        day_ns, prices, rf, vol = self._align_market_data(stock_data, risk_free_rates, volatility)
+        n_days = len(day_ns)
         
-        # Run daily loop
-        for date, row in stock_data.iterrows():
-            current_price = row['Adj_Close']
-            
-            # Get risk-free rate for this date
-            if date in risk_free_rates.index:
-                risk_free_rate = risk_free_rates[date]
-            else:
-                # Forward fill if missing
-                risk_free_rate = risk_free_rates.fillna(method='ffill').loc[date]
-            
-            # Get volatility for this date
-            if date in volatility.index:
-                vol = volatility[date]
-            else:
-                # Use last available volatility
-                vol = volatility.fillna(method='ffill').loc[date]
-            
-            # Calculate stock P/L
-            stock_pl = self.stock_position.calculate_daily_pl(current_price)
-            
-            # Calculate option P/L
-            option_pl = 0.0
-            current_option_value = 0.0
-            
-            for option in self.option_positions:
-                if option.is_active:
-                    # Calculate time to expiry
-                    time_to_expiry = (option.expiry - date).days / 365.0
-                    
-                    # Check for exercise on expiry date
-                    should_exercise, exercise_value = option.check_exercise(date, current_price)
-                    
-                    if should_exercise:
-                        option_pl += exercise_value
-                        option.exercise()
-                    else:
-                        # Calculate daily option P/L
-                        option_value = option.calculate_mtm_value(
-                            current_price, time_to_expiry, vol, risk_free_rate, dividend_yield
-                        )
-                        current_option_value += option_value
-                        
-                        # Calculate daily change
-                        if date == option.trade_date:
-                            # First day: compare to initial cash flow
-                            option_pl += option_value - option.initial_cash_flow
-                        else:
-                            # Subsequent days: use previous day's value
-                            option_pl += option_value - previous_option_value
-            
-            # Calculate total P/L
-            total_pl = stock_pl + option_pl
-            
-            # Store results
-            self.equity_curve.append({
-                'Date': date,
-                'Stock_PL': stock_pl,
-                'Option_PL': option_pl,
-                'Total_PL': total_pl,
-                'Daily_Change': total_pl - (previous_stock_value + previous_option_value),
-                'Equity': total_pl
-            })
-            
-            # Update previous values for next iteration
-            previous_stock_value = stock_pl
-            previous_option_value = current_option_value
+        # Stock P/L is linear in price, so the whole curve is one expression
+        stock_pl = self.stock_position.calculate_daily_pl(prices)
+        
+        # Option P/L: price every (day, leg) cell in one pass
+        legs = self.option_book.arrays()
+        contracts = legs['mult']  # signed shares, 100 per contract
+        
+        option_value = self._price_legs(legs, day_ns, prices, rf, vol, dividend_yield)
+        
+        # Branchless leg lifecycle: exercise at intrinsic value on the last
+        # trading day on or before expiry, then hold that settled value.
+        # Only legs expiring inside the window settle; a leg expiring after
+        # the last day stays marked to model, so settle_idx = n_days never matches
+        day_idx = np.arange(n_days)[:, None]
+        settle_idx = np.searchsorted(day_ns, legs['expiries'], side='right') - 1
+        expired_before = settle_idx < 0
+        settle_idx = np.where(legs['expiries'] <= day_ns[-1], settle_idx, n_days)
+        is_expiry = day_idx == settle_idx[None, :]
+        intrinsic = np.maximum(np.where(legs['is_call'], 1.0, -1.0) * (prices[:, None] - legs['strikes']), 0.0)
+        option_value = np.where(is_expiry, contracts * intrinsic, option_value)
+        settled_value = option_value[np.clip(settle_idx, 0, n_days - 1), np.arange(len(settle_idx))]
+        option_value = np.where(day_idx > settle_idx[None, :], settled_value[None, :], option_value)
+        
+        # P/L relative to the premium paid (long) or received (short). A leg
+        # that expired before the first day was settled outside the window
+        # and contributes nothing to it
+        held = ((day_ns[:, None] >= legs['trade_dates'][None, :])
+                & (legs['is_active'] & ~expired_before)[None, :])
+        leg_pl = np.where(held, option_value - contracts * legs['premiums'], 0.0)
+        
+        # Output columns are allocated once and written in place
+        option_pl = np.empty(n_days)
+        total_pl = np.empty(n_days)
+        daily_change = np.empty(n_days)
+        
+        np.sum(leg_pl, axis=1, out=option_pl)
+        np.add(stock_pl, option_pl, out=total_pl)
+        daily_change[:1] = total_pl[:1]
+        np.subtract(total_pl[1:], total_pl[:-1], out=daily_change[1:])
         
-        # Convert to DataFrame
-        results_df = pd.DataFrame(self.equity_curve)
-        results_df.set_index('Date', inplace=True)
+        # Build the results in one shot, without copying the columns
+        results_df = pd.DataFrame({
+            'Stock_PL': stock_pl,
+            'Option_PL': option_pl,
+            'Total_PL': total_pl,
+            'Daily_Change': daily_change,
+            'Equity': total_pl
+        }, index=stock_data.index.rename('Date'), copy=False)
         
+        self._results_df = results_df
         return results_df
     
     def save_results(self, output_dir: str = "results"):
@@ -227,10 +362,10 @@ class BacktestEngine:
         cagr = (total_return / initial_value) ** (1 / years) - 1 if years > 0 else 0
         
         # Calculate max drawdown
-        cumulative_returns = results_df['Total_PL'] + initial_value
-        running_max = cumulative_returns.expanding().max()
+        cumulative_returns = results_df['Total_PL'].to_numpy() + initial_value
+        running_max = np.fmax.accumulate(cumulative_returns)  # NaN-skipping, like expanding().max()
         drawdown = (cumulative_returns - running_max) / running_max
-        max_drawdown = drawdown.min()
+        max_drawdown = np.nanmin(drawdown)
         
         # Calculate Sharpe ratio (assuming 0% risk-free rate for simplicity)
         daily_returns = results_df['Daily_Change'] / initial_value
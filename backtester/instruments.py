@@ -6,11 +6,149 @@ Contains classes for managing option and stock positions with pricing and P/L ca
 
 import pandas as pd
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
 from datetime import datetime, date
 from typing import Dict, List, Optional, Tuple
 import warnings
 
+from ._kernels import _bs_greeks, _bs_price
+
+
+INV_SQRT_2PI = (2 * np.pi) ** -0.5
+
+# Nanoseconds in a 365-day year, the day-count basis used for option pricing
+NS_PER_YEAR = 365 * 86400 * 10**9
+
+
+def _as_float(x):
+    """Convert to an array, keeping float32 inputs in single precision."""
+    x = np.asarray(x)
+    return x if x.dtype.kind == 'f' else x.astype(np.float64)
+
+
+def _parse_date(value) -> pd.Timestamp:
+    """
+    Convert a date argument to a Timestamp.
+    
+    Timestamps pass through untouched. Everything else goes to the
+    Timestamp constructor, which parses an ISO string in about a microsecond;
+    pd.to_datetime spends a couple of hundred on format inference for a
+    single scalar.
+    """
+    return value if isinstance(value, pd.Timestamp) else pd.Timestamp(value)
+
+
+def _bs_terms(S, K, T, sigma, r, q, log_moneyness=None, sqrt_T=None):
+    """
+    Intermediates shared by the price and every greek.
+    
+    Call under np.errstate: expired cells (T <= 0) produce inf/nan here.
+    
+    Returns:
+        Tuple of (d1, d2, sqrt_T, S_fwd, K_disc) where S_fwd = S*exp(-qT)
+        and K_disc = K*exp(-rT)
+    """
+    if log_moneyness is None:
+        log_moneyness = np.log(S / K)
+    if sqrt_T is None:
+        sqrt_T = np.sqrt(T)
+    
+    sig_sqrt_T = sigma * sqrt_T
+    d1 = (log_moneyness + (r - q + 0.5 * sigma * sigma) * T) / sig_sqrt_T
+    d2 = d1 - sig_sqrt_T
+    
+    return d1, d2, sqrt_T, S * np.exp(-q * T), K * np.exp(-r * T)
+
+
+def black_scholes_price_batch(S, K, T, sigma, r, q, is_call, log_moneyness=None, sqrt_T=None):
+    """
+    Black-Scholes-Merton price on broadcastable arrays.
+    
+    Prices a whole option chain, or a whole (day, leg) grid, in one set of
+    ufunc calls. Cells with no time left (T <= 0) are worth their intrinsic
+    value.
+    
+    Args:
+        S: Stock price
+        K: Strike price
+        T: Time to expiry in years
+        sigma: Annualized volatility
+        r: Risk-free rate
+        q: Dividend yield
+        is_call: True for calls, False for puts
+        log_moneyness: Precomputed log(S / K), if already available
+        sqrt_T: Precomputed sqrt(T), if already available
+    
+    Returns:
+        Option price array
+    """
+    S = _as_float(S)
+    T = _as_float(T)
+    sign = np.where(is_call, 1.0, -1.0).astype(S.dtype, copy=False)
+    
+    # Expired cells produce inf/nan here and are masked out below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2, sqrt_T, S_fwd, K_disc = _bs_terms(S, K, T, sigma, r, q, log_moneyness, sqrt_T)
+        
+        # Calls and puts share one expression: sign * (S_fwd N(sign d1) - K_disc N(sign d2)),
+        # so each cell costs two CDF evaluations instead of four
+        price = sign * (S_fwd * ndtr(sign * d1) - K_disc * ndtr(sign * d2))
+    
+    return np.where(T > 0, price, np.maximum(sign * (S - K), 0.0))
+
+
+def black_scholes_greeks_batch(S, K, T, sigma, r, q, is_call) -> Dict[str, np.ndarray]:
+    """
+    Black-Scholes-Merton price and greeks on broadcastable arrays.
+    
+    d1, d2, both CDF values and the density at d1 are evaluated once and
+    reused for all five outputs. Expired cells (T <= 0) get their intrinsic
+    value, a delta of 0 or +/-1 and zero gamma, vega and theta.
+    
+    Args:
+        S: Stock price
+        K: Strike price
+        T: Time to expiry in years
+        sigma: Annualized volatility
+        r: Risk-free rate
+        q: Dividend yield
+        is_call: True for calls, False for puts
+    
+    Returns:
+        Dictionary of price, delta, gamma, vega and theta (per year) arrays
+    """
+    S = _as_float(S)
+    T = _as_float(T)
+    sign = np.where(is_call, 1.0, -1.0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2, sqrt_T, S_fwd, K_disc = _bs_terms(S, K, T, sigma, r, q)
+        
+        # N(d) for calls, N(-d) for puts
+        N1 = ndtr(sign * d1)
+        N2 = ndtr(sign * d2)
+        pdf_d1 = np.exp(-0.5 * d1 * d1) * INV_SQRT_2PI
+        
+        S_fwd_N1 = S_fwd * N1
+        S_fwd_pdf = S_fwd * pdf_d1
+        
+        price = sign * (S_fwd_N1 - K_disc * N2)
+        delta = sign * S_fwd_N1 / S
+        gamma = S_fwd_pdf / (S * S * sigma * sqrt_T)
+        vega = S_fwd_pdf * sqrt_T
+        theta = -S_fwd_pdf * sigma / (2 * sqrt_T) - sign * (r * K_disc * N2 - q * S_fwd_N1)
+    
+    live = T > 0
+    payoff = np.maximum(sign * (S - K), 0.0)
+    
+    return {
+        'price': np.where(live, price, payoff),
+        'delta': np.where(live, delta, np.where(payoff > 0, sign, 0.0)),
+        'gamma': np.where(live, gamma, 0.0),
+        'vega': np.where(live, vega, 0.0),
+        'theta': np.where(live, theta, 0.0),
+    }
+
 
 class OptionPosition:
     """
@@ -38,8 +176,8 @@ class OptionPosition:
         self.strike = float(strike)
         self.premium = float(premium)
         self.qty = int(qty)
-        self.trade_date = pd.to_datetime(trade_date)
-        self.expiry = pd.to_datetime(expiry)
+        self.trade_date = _parse_date(trade_date)
+        self.expiry = _parse_date(expiry)
         
         # Validate inputs
         self._validate_inputs()
@@ -47,9 +185,20 @@ class OptionPosition:
         # Calculate initial cash flow
         self.initial_cash_flow = self.premium * self.qty * 100  # 100 shares per contract
         
+        # Per-position constants for the pricing hot path
+        self._side_sign = -1.0 if self.side == 'short' else 1.0
+        self._mult = self._side_sign * self.qty * 100
+        self._payoff_sign = 1.0 if self.option_type == 'call' else -1.0
+        self._trade_ord = self.trade_date.toordinal()
+        self._expiry_ord = self.expiry.toordinal()
+        
         # Track if position is active
         self.is_active = True
         
+        # Slot in an OptionBook, if the position has been added to one
+        self._book = None
+        self._slot = None
+        
     def _validate_inputs(self):
         """Validate option position parameters."""
         if self.side not in ['long', 'short']:
@@ -73,46 +222,66 @@ class OptionPosition:
         """
         Calculate option price using Black-Scholes-Merton model.
         
+        Market inputs may be scalars or arrays of matching shape, so a whole
+        date range can be priced in a single call. A single scalar quote goes
+        through the scalar kernel, which works on plain floats with the math
+        module and is compiled when Numba is installed; only arrays take the
+        NumPy path.
+        
         Args:
             spot: Current stock price
             time_to_expiry: Time to expiry in years
             volatility: Annualized volatility (as decimal)
             risk_free_rate: Risk-free rate (as decimal)
             dividend_yield: Dividend yield (as decimal)
-            
+        
         Returns:
-            Option price
+            Option price (an array if any input is an array)
         """
-        if time_to_expiry <= 0:
-            # Option has expired
-            return self._intrinsic_value(spot)
+        market = (spot, time_to_expiry, volatility, risk_free_rate, dividend_yield)
+        if all(np.ndim(x) == 0 for x in market):
+            return _bs_price(float(spot), self.strike, float(time_to_expiry), float(volatility),
+                             float(risk_free_rate), float(dividend_yield), self.option_type == 'call')
         
-        # Black-Scholes parameters
-        S = spot
-        K = self.strike
-        T = time_to_expiry
-        sigma = volatility
-        r = risk_free_rate
-        q = dividend_yield
+        price = black_scholes_price_batch(spot, self.strike, time_to_expiry, volatility,
+                                          risk_free_rate, dividend_yield, self.option_type == 'call')
         
-        # Calculate d1 and d2
-        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
+        return price if price.ndim else float(price)
+    
+    def black_scholes_price_and_greeks(self, spot: float, time_to_expiry: float,
+                                       volatility: float, risk_free_rate: float,
+                                       dividend_yield: float = 0.0) -> Dict[str, float]:
+        """
+        Calculate option price and greeks in one pass.
         
-        # Calculate option price
-        if self.option_type == 'call':
-            price = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-        else:  # put
-            price = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+        Market inputs may be scalars or arrays of matching shape, as for
+        black_scholes_price.
         
-        return price
+        Args:
+            spot: Current stock price
+            time_to_expiry: Time to expiry in years
+            volatility: Annualized volatility (as decimal)
+            risk_free_rate: Risk-free rate (as decimal)
+            dividend_yield: Dividend yield (as decimal)
+        
+        Returns:
+            Dictionary with price, delta, gamma, vega and theta (per year)
+        """
+        market = (spot, time_to_expiry, volatility, risk_free_rate, dividend_yield)
+        if all(np.ndim(x) == 0 for x in market):
+            values = _bs_greeks(float(spot), self.strike, float(time_to_expiry), float(volatility),
+                                float(risk_free_rate), float(dividend_yield), self.option_type == 'call')
+            return dict(zip(['price', 'delta', 'gamma', 'vega', 'theta'], values))
+        
+        greeks = black_scholes_greeks_batch(spot, self.strike, time_to_expiry, volatility,
+                                            risk_free_rate, dividend_yield, self.option_type == 'call')
+        
+        return {name: value if value.ndim else float(value) for name, value in greeks.items()}
     
     def _intrinsic_value(self, spot: float) -> float:
         """Calculate intrinsic value of the option."""
-        if self.option_type == 'call':
-            return max(0, spot - self.strike)
-        else:  # put
-            return max(0, self.strike - spot)
+        # max(S - K, 0) for calls, max(K - S, 0) for puts
+        return np.maximum(self._payoff_sign * (spot - self.strike), 0.0)
     
     def calculate_mtm_value(self, spot: float, time_to_expiry: float,
                            volatility: float, risk_free_rate: float,
@@ -138,14 +307,8 @@ class OptionPosition:
             spot, time_to_expiry, volatility, risk_free_rate, dividend_yield
         )
         
-        # Calculate position value
-        position_value = option_price * self.qty * 100  # 100 shares per contract
-        
-        # Adjust for side (short positions have negative value)
-        if self.side == 'short':
-            position_value = -position_value
-        
-        return position_value
+        # Signed multiplier: 100 shares per contract, negative for shorts
+        return option_price * self._mult
     
     def calculate_daily_pl(self, current_date: pd.Timestamp, spot: float,
                           volatility: float, risk_free_rate: float,
@@ -160,6 +323,29 @@ class OptionPosition:
             risk_free_rate: Risk-free rate
             dividend_yield: Dividend yield
             
+        Returns:
+            Daily P/L
+        """
+        return self.calculate_daily_pl_fast(
+            current_date.toordinal(), spot, volatility, risk_free_rate, dividend_yield
+        )
+    
+    def calculate_daily_pl_fast(self, today_ord: int, spot: float,
+                                volatility: float, risk_free_rate: float,
+                                dividend_yield: float = 0.0) -> float:
+        """
+        Calculate daily P/L for the position from a proleptic Gregorian ordinal.
+        
+        Callers stepping through many dates can convert each date once with
+        toordinal() and skip the Timestamp/Timedelta arithmetic per position.
+        
+        Args:
+            today_ord: Current date as returned by date.toordinal()
+            spot: Current stock price
+            volatility: Annualized volatility
+            risk_free_rate: Risk-free rate
+            dividend_yield: Dividend yield
+        
         Returns:
             Daily P/L
         """
@@ -167,7 +353,7 @@ class OptionPosition:
             return 0.0
         
         # Calculate time to expiry
-        time_to_expiry = (self.expiry - current_date).days / 365.0
+        time_to_expiry = (self._expiry_ord - today_ord) / 365.0
         
         # Calculate current MTM value
         current_value = self.calculate_mtm_value(
@@ -175,7 +361,7 @@ class OptionPosition:
         )
         
         # For the first day, compare to initial cash flow
-        if current_date == self.trade_date:
+        if today_ord == self._trade_ord:
             return current_value - self.initial_cash_flow
         
         # For subsequent days, we need to track previous day's value
@@ -201,19 +387,15 @@ class OptionPosition:
         
         if intrinsic_value > 0:
             # Option is ITM, should exercise
-            exercise_value = intrinsic_value * self.qty * 100
-            
-            # Adjust for side
-            if self.side == 'short':
-                exercise_value = -exercise_value
-            
-            return True, exercise_value
+            return True, intrinsic_value * self._mult
         
         return False, 0.0
     
     def exercise(self):
         """Mark the position as exercised (no longer active)."""
         self.is_active = False
+        if self._book is not None:
+            self._book.exercise(self._slot)
     
     def __str__(self) -> str:
         """String representation of the option position."""
@@ -221,6 +403,145 @@ class OptionPosition:
                 f"@ {self.strike} (Premium: {self.premium:.2f})")
 
 
+class OptionBook:
+    """
+    Structure-of-arrays store for a portfolio of option legs.
+    
+    Each leg occupies one slot of a set of parallel NumPy arrays, so the whole
+    book is priced with one batch call per date instead of one call per
+    position. Capacity grows by doubling as legs are added.
+    """
+    
+    _FIELDS = {
+        'strikes': np.float64,
+        'premiums': np.float64,  # absolute premium per share
+        'mult': np.float64,  # signed shares: side * qty * 100
+        'is_call': bool,
+        'trade_dates': np.int64,  # nanoseconds since epoch
+        'expiries': np.int64,  # nanoseconds since epoch
+        'is_active': bool,
+    }
+    
+    def __init__(self, capacity: int = 8):
+        """
+        Initialize an empty option book.
+        
+        Args:
+            capacity: Initial number of leg slots
+        """
+        self.size = 0
+        self._data = {name: np.zeros(max(capacity, 1), dtype=dtype)
+                      for name, dtype in self._FIELDS.items()}
+    
+    def __len__(self) -> int:
+        """Number of legs in the book."""
+        return self.size
+    
+    def add(self, option: OptionPosition) -> int:
+        """
+        Append an option position to the book.
+        
+        The position keeps a reference to its slot, so exercising it also
+        deactivates the slot.
+        
+        Args:
+            option: Position to add
+        
+        Returns:
+            Slot index of the new leg
+        """
+        if self.size == len(self._data['strikes']):
+            for name, values in self._data.items():
+                grown = np.zeros(2 * len(values), dtype=values.dtype)
+                grown[:self.size] = values
+                self._data[name] = grown
+        
+        slot = self.size
+        self._data['strikes'][slot] = option.strike
+        self._data['premiums'][slot] = abs(option.premium)
+        self._data['mult'][slot] = option._mult
+        self._data['is_call'][slot] = option.option_type == 'call'
+        self._data['trade_dates'][slot] = option.trade_date.value
+        self._data['expiries'][slot] = option.expiry.value
+        self._data['is_active'][slot] = option.is_active
+        self.size += 1
+        
+        option._book = self
+        option._slot = slot
+        return slot
+    
+    def exercise(self, slot: int):
+        """Mark the leg in *slot* as exercised (no longer active)."""
+        self._data['is_active'][slot] = False
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        View the book as one array per leg field.
+        
+        Returns:
+            Dictionary of length-``len(self)`` views, keyed like _FIELDS
+        """
+        return {name: values[:self.size] for name, values in self._data.items()}
+    
+    def intrinsic_values(self, spot: float) -> np.ndarray:
+        """
+        Calculate intrinsic value per share of every leg.
+        
+        Args:
+            spot: Current stock price
+        
+        Returns:
+            Intrinsic value array, ordered by slot
+        """
+        legs = self.arrays()
+        return np.maximum(np.where(legs['is_call'], 1.0, -1.0) * (spot - legs['strikes']), 0.0)
+    
+    def check_exercise(self, current_date: pd.Timestamp, spot: float) -> Tuple[np.ndarray, float]:
+        """
+        Check every leg for exercise at once, as OptionPosition.check_exercise.
+        
+        A leg is exercised when it is active, expires on current_date and is
+        in the money.
+        
+        Args:
+            current_date: Current date
+            spot: Current stock price
+        
+        Returns:
+            Tuple of (exercise mask per slot, total signed exercise value)
+        """
+        legs = self.arrays()
+        intrinsic = self.intrinsic_values(spot)
+        exercise = (legs['expiries'] == pd.Timestamp(current_date).value) & legs['is_active'] & (intrinsic > 0)
+        
+        return exercise, float(np.dot(np.where(exercise, intrinsic, 0.0), legs['mult']))
+    
+    def mtm_value(self, spot: float, current_date: pd.Timestamp, volatility: float,
+                  risk_free_rate: float, dividend_yield: float = 0.0) -> float:
+        """
+        Calculate mark-to-market value of every held leg on one date.
+        
+        Args:
+            spot: Current stock price
+            current_date: Valuation date
+            volatility: Annualized volatility
+            risk_free_rate: Risk-free rate
+            dividend_yield: Dividend yield
+        
+        Returns:
+            Total signed value of the active legs traded on or before the date
+        """
+        legs = self.arrays()
+        now = pd.Timestamp(current_date).value
+        
+        time_to_expiry = np.maximum(legs['expiries'] - now, 0) / NS_PER_YEAR
+        prices = black_scholes_price_batch(spot, legs['strikes'], time_to_expiry, volatility,
+                                           risk_free_rate, dividend_yield, legs['is_call'])
+        held = legs['is_active'] & (legs['trade_dates'] <= now)
+        
+        return float(np.dot(np.where(held, prices, 0.0), legs['mult']))
+
+
 class StockPosition:
     """
     Represents a stock position with P/L calculations.
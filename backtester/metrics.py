@@ -7,7 +7,35 @@ returns, drawdowns, Sharpe ratio, and alpha vs. buy-and-hold.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List, NamedTuple
+
+from ._kernels import (
+    NUMBA_AVAILABLE, drawdown_scan, paired_moments, return_moments, rolling_max, rolling_mean_std
+)
+
+try:
+    import bottleneck as bn
+except ImportError:  # pragma: no cover - bottleneck is optional
+    bn = None
+
+
+class DrawdownPeriods(NamedTuple):
+    """
+    Drawdown periods as parallel arrays, one entry per period.
+    
+    A period starts on the first day below the running peak and ends on the
+    first day back at it, or on the last day if it never recovers.
+    """
+    start_date: pd.DatetimeIndex
+    end_date: pd.DatetimeIndex
+    max_drawdown: np.ndarray
+    
+    def to_records(self) -> List[Dict]:
+        """Return the periods as a list of dicts, one per period."""
+        return [
+            {'start_date': start, 'end_date': end, 'max_drawdown': dd}
+            for start, end, dd in zip(self.start_date, self.end_date, self.max_drawdown)
+        ]
 
 
 def calculate_metrics(equity_curve: pd.DataFrame, 
@@ -16,6 +44,9 @@ def calculate_metrics(equity_curve: pd.DataFrame,
     """
     Calculate comprehensive performance metrics.
     
+    Thin wrapper around :func:`calculate_metrics_arrays`: the columns are
+    unpacked to arrays here and the benchmark is aligned to the equity dates.
+    
     Args:
         equity_curve: DataFrame with Date index and Total_PL column
         benchmark_curve: Optional benchmark data for comparison
@@ -24,33 +55,115 @@ def calculate_metrics(equity_curve: pd.DataFrame,
     Returns:
         Dictionary containing all calculated metrics
     """
+    benchmark_change = None
+    if benchmark_curve is not None:
+        # Days missing from the benchmark become NaN and are skipped pairwise
+        benchmark_change = benchmark_curve['Daily_Change'].reindex(equity_curve.index).to_numpy(dtype=np.float64)
+    
+    return calculate_metrics_arrays(
+        equity_curve['Total_PL'].to_numpy(dtype=np.float64),
+        equity_curve['Daily_Change'].to_numpy(dtype=np.float64),
+        equity_curve.index.to_numpy(dtype='datetime64[ns]'),
+        benchmark_change,
+        risk_free_rate
+    )
+
+
+def calculate_metrics_arrays(total_pl: np.ndarray,
+                             daily_change: np.ndarray,
+                             dates: np.ndarray,
+                             benchmark_change: Optional[np.ndarray] = None,
+                             risk_free_rate: float = 0.02) -> Dict:
+    """
+    Calculate comprehensive performance metrics from plain arrays.
+    
+    Args:
+        total_pl: Total P/L per day
+        daily_change: Day-over-day change in P/L
+        dates: ``datetime64`` dates of the rows, in ascending order
+        benchmark_change: Optional benchmark daily changes aligned to ``dates``
+        risk_free_rate: Annual risk-free rate (default 2%)
+    
+    Returns:
+        Dictionary containing all calculated metrics
+    """
+    total_pl = np.asarray(total_pl, dtype=np.float64)
+    daily_change = np.asarray(daily_change, dtype=np.float64)
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    
     metrics = {}
     
+    # Daily changes without missing days, shared by the return and risk metrics
+    daily_changes = _valid_values(daily_change)
+    
     # Basic return metrics
-    metrics.update(_calculate_return_metrics(equity_curve))
+    metrics.update(_calculate_return_metrics(total_pl, dates, daily_changes))
     
     # Risk metrics
-    metrics.update(_calculate_risk_metrics(equity_curve, risk_free_rate))
+    metrics.update(_calculate_risk_metrics(total_pl, daily_changes, risk_free_rate))
     
     # Drawdown analysis
-    metrics.update(_calculate_drawdown_metrics(equity_curve))
+    metrics.update(_calculate_drawdown_metrics(total_pl, dates))
     
     # Benchmark comparison (if provided)
-    if benchmark_curve is not None:
-        metrics.update(_calculate_benchmark_metrics(equity_curve, benchmark_curve))
+    if benchmark_change is not None:
+        metrics.update(_calculate_benchmark_metrics(
+            daily_change, np.asarray(benchmark_change, dtype=np.float64)))
     
     return metrics
 
 
-def _calculate_return_metrics(equity_curve: pd.DataFrame) -> Dict:
+def _valid_values(values: np.ndarray) -> np.ndarray:
+    """Return the non-NaN entries of an array."""
+    valid = ~np.isnan(values)
+    return values if valid.all() else values[valid]
+
+
+def _days_between(start: np.datetime64, end: np.datetime64) -> int:
+    """Whole days from *start* to *end*, floored like ``Timedelta.days``."""
+    return int((end - start) // np.timedelta64(1, 'D'))
+
+
+def _mean(values: np.ndarray) -> float:
+    """Mean of an array; NaN when empty, as pandas returns."""
+    return values.mean() if len(values) > 0 else np.nan
+
+
+def _sample_std(n: int, m2: float) -> float:
+    """Sample standard deviation (ddof=1) from a squared-deviation sum; NaN below two values, as pandas returns."""
+    return np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+
+
+def _return_moments(x: np.ndarray) -> Tuple:
+    """
+    Moments of a return series and of its losing days.
+    
+    Uses the fused kernel when Numba compiles it; otherwise a few NumPy
+    reductions, as the kernel would be an interpreted loop.
+    """
+    if NUMBA_AVAILABLE:
+        return return_moments(x)
+    
+    n = len(x)
+    if n == 0:
+        return 0, np.nan, 0.0, 0, np.nan, 0.0, np.nan
+    
+    mean = x.mean()
+    d = x - mean
+    down = x[x < 0]
+    n_down = len(down)
+    mean_down = down.mean() if n_down > 0 else np.nan
+    d_down = down - mean_down
+    return n, mean, np.dot(d, d), n_down, mean_down, np.dot(d_down, d_down), x.min()
+
+
+def _calculate_return_metrics(pl: np.ndarray, dates: np.ndarray, daily_changes: np.ndarray) -> Dict:
     """Calculate return-related metrics."""
-    total_pl = equity_curve['Total_PL'].iloc[-1]
-    initial_value = equity_curve['Total_PL'].iloc[0] if len(equity_curve) > 0 else 0
+    total_pl = pl[-1]
+    initial_value = pl[0] if len(pl) > 0 else 0
     
     # Calculate time period
-    start_date = equity_curve.index[0]
-    end_date = equity_curve.index[-1]
-    years = (end_date - start_date).days / 365.0
+    years = _days_between(dates[0], dates[-1]) / 365.0
     
     # Total return
     total_return = total_pl - initial_value
@@ -60,8 +173,7 @@ def _calculate_return_metrics(equity_curve: pd.DataFrame) -> Dict:
     cagr = ((total_pl / abs(initial_value)) ** (1 / years) - 1) * 100 if years > 0 and initial_value != 0 else 0
     
     # Average daily return
-    daily_returns = equity_curve['Daily_Change'].dropna()
-    avg_daily_return = daily_returns.mean()
+    avg_daily_return = _mean(daily_changes)
     avg_daily_return_pct = (avg_daily_return / abs(initial_value)) * 100 if initial_value != 0 else 0
     
     return {
@@ -74,29 +186,31 @@ def _calculate_return_metrics(equity_curve: pd.DataFrame) -> Dict:
     }
 
 
-def _calculate_risk_metrics(equity_curve: pd.DataFrame, risk_free_rate: float) -> Dict:
-    """Calculate risk-related metrics."""
-    daily_returns = equity_curve['Daily_Change'].dropna()
-    initial_value = equity_curve['Total_PL'].iloc[0] if len(equity_curve) > 0 else 1
+def _calculate_risk_metrics(pl: np.ndarray, daily_changes: np.ndarray,
+                            risk_free_rate: float) -> Dict:
+    """Calculate risk-related metrics from one fused pass over the returns."""
+    initial_value = pl[0] if len(pl) > 0 else 1
     
     # Convert to percentage returns
-    daily_return_pcts = daily_returns / abs(initial_value) * 100
+    daily_return_pcts = daily_changes / abs(initial_value) * 100
+    
+    # Mean, variance, downside variance and worst day in a single pass
+    n, mean_return, m2, n_down, _, m2_down, max_daily_loss_pct = _return_moments(daily_return_pcts)
+    return_std = _sample_std(n, m2)
     
     # Volatility (annualized)
-    volatility = daily_return_pcts.std() * np.sqrt(252)
+    volatility = return_std * np.sqrt(252)
     
     # Sharpe ratio
-    excess_returns = daily_return_pcts - (risk_free_rate * 100 / 252)  # Daily risk-free rate
-    sharpe = excess_returns.mean() / daily_return_pcts.std() * np.sqrt(252) if daily_return_pcts.std() > 0 else 0
+    excess_mean = mean_return - (risk_free_rate * 100 / 252)  # Daily risk-free rate
+    sharpe = excess_mean / return_std * np.sqrt(252) if return_std > 0 else 0
     
     # Sortino ratio (using downside deviation)
-    downside_returns = daily_return_pcts[daily_return_pcts < 0]
-    downside_deviation = downside_returns.std() * np.sqrt(252) if len(downside_returns) > 0 else 0
-    sortino = excess_returns.mean() / downside_deviation * np.sqrt(252) if downside_deviation > 0 else 0
+    downside_deviation = _sample_std(n_down, m2_down) * np.sqrt(252) if n_down > 0 else 0
+    sortino = excess_mean / downside_deviation * np.sqrt(252) if downside_deviation > 0 else 0
     
     # Maximum daily loss
-    max_daily_loss = daily_returns.min()
-    max_daily_loss_pct = daily_return_pcts.min()
+    max_daily_loss = daily_changes.min() if len(daily_changes) > 0 else np.nan
     
     return {
         'volatility': volatility,
@@ -107,28 +221,20 @@ def _calculate_risk_metrics(equity_curve: pd.DataFrame, risk_free_rate: float) -
     }
 
 
-def _calculate_drawdown_metrics(equity_curve: pd.DataFrame) -> Dict:
-    """Calculate drawdown-related metrics."""
-    # Calculate cumulative equity
-    cumulative_equity = equity_curve['Total_PL'].cumsum()
-    
-    # Calculate running maximum
-    running_max = cumulative_equity.expanding().max()
-    
-    # Calculate drawdown
-    drawdown = (cumulative_equity - running_max) / running_max * 100
+def _calculate_drawdown_metrics(pl: np.ndarray, dates: np.ndarray) -> Dict:
+    """Calculate drawdown-related metrics in a single pass over the P/L."""
+    # Cumulative equity, running maximum, drawdown, periods and recovery
+    max_drawdown, max_dd_idx, avg_drawdown, recovery_idx, starts, ends, mins = drawdown_scan(pl)
     
-    # Maximum drawdown
-    max_drawdown = drawdown.min()
-    
-    # Find drawdown periods
-    drawdown_periods = _find_drawdown_periods(drawdown)
-    
-    # Average drawdown
-    avg_drawdown = drawdown[drawdown < 0].mean() if len(drawdown[drawdown < 0]) > 0 else 0
+    drawdown_periods = DrawdownPeriods(pd.DatetimeIndex(dates[starts]), pd.DatetimeIndex(dates[ends]), mins)
     
     # Time to recovery (from max drawdown)
-    recovery_time = _calculate_recovery_time(cumulative_equity, drawdown)
+    if max_dd_idx < 0 or max_drawdown >= 0:
+        recovery_time = 0  # No drawdown
+    elif recovery_idx < 0:
+        recovery_time = -1  # No recovery found
+    else:
+        recovery_time = _days_between(dates[max_dd_idx], dates[recovery_idx])
     
     return {
         'max_drawdown': max_drawdown,
@@ -138,86 +244,58 @@ def _calculate_drawdown_metrics(equity_curve: pd.DataFrame) -> Dict:
     }
 
 
-def _find_drawdown_periods(drawdown: pd.Series) -> List[Dict]:
-    """Find all drawdown periods."""
-    periods = []
-    in_drawdown = False
-    start_date = None
-    
-    for date, dd in drawdown.items():
-        if dd < 0 and not in_drawdown:
-            # Start of drawdown
-            in_drawdown = True
-            start_date = date
-        elif dd >= 0 and in_drawdown:
-            # End of drawdown
-            in_drawdown = False
-            periods.append({
-                'start_date': start_date,
-                'end_date': date,
-                'max_drawdown': drawdown.loc[start_date:date].min()
-            })
-    
-    # Handle case where drawdown continues to end
-    if in_drawdown:
-        periods.append({
-            'start_date': start_date,
-            'end_date': drawdown.index[-1],
-            'max_drawdown': drawdown.loc[start_date:].min()
-        })
-    
-    return periods
-
-
-def _calculate_recovery_time(cumulative_equity: pd.Series, drawdown: pd.Series) -> int:
-    """Calculate time to recovery from maximum drawdown."""
-    max_dd_idx = drawdown.idxmin()
-    max_dd_value = drawdown.loc[max_dd_idx]
-    
-    if max_dd_value >= 0:
-        return 0  # No drawdown
-    
-    # Find when equity recovers to the level it was at max drawdown
-    recovery_level = cumulative_equity.loc[max_dd_idx]
-    
-    # Find next time equity reaches this level
-    recovery_mask = cumulative_equity.loc[max_dd_idx:] >= recovery_level
-    recovery_dates = recovery_mask[recovery_mask].index
-    
-    if len(recovery_dates) > 0:
-        recovery_date = recovery_dates[0]
-        recovery_time = (recovery_date - max_dd_idx).days
-        return recovery_time
+def _paired_moments(x: np.ndarray, y: np.ndarray) -> Tuple:
+    """
+    Means and co-moments of two series, skipping NaN pairs.
     
-    return -1  # No recovery found
+    Uses the single-pass kernel when Numba compiles it; otherwise centred
+    NumPy dot products, as the kernel would be an interpreted loop.
+    """
+    if NUMBA_AVAILABLE:
+        return paired_moments(x, y)
+    
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    n = len(x)
+    if n == 0:
+        return 0, np.nan, np.nan, 0.0, 0.0, 0.0
+    
+    mean_x, mean_y = x.mean(), y.mean()
+    dx = x - mean_x
+    dy = y - mean_y
+    return n, mean_x, mean_y, np.dot(dx, dx), np.dot(dy, dy), np.dot(dx, dy)
 
 
-def _calculate_benchmark_metrics(equity_curve: pd.DataFrame, 
-                                benchmark_curve: pd.DataFrame) -> Dict:
-    """Calculate metrics comparing to benchmark."""
-    # Align dates
-    common_dates = equity_curve.index.intersection(benchmark_curve.index)
-    strategy_returns = equity_curve.loc[common_dates, 'Daily_Change']
-    benchmark_returns = benchmark_curve.loc[common_dates, 'Daily_Change']
+def _calculate_benchmark_metrics(strategy_returns: np.ndarray, 
+                                benchmark_returns: np.ndarray) -> Dict:
+    """Calculate metrics comparing to benchmark from one pass of co-moments."""
+    # Means, variances and covariance of both series in a single pass;
+    # days where either side is NaN are skipped
+    n, mean_s, mean_b, m2_s, m2_b, c_sb = _paired_moments(strategy_returns, benchmark_returns)
     
-    # Calculate excess returns
-    excess_returns = strategy_returns - benchmark_returns
+    # Excess returns: var(s - b) follows from the same moments
+    excess_mean = mean_s - mean_b
+    excess_std = np.sqrt(max(m2_s + m2_b - 2 * c_sb, 0.0) / (n - 1)) if n > 1 else np.nan
     
     # Information ratio
-    info_ratio = excess_returns.mean() / excess_returns.std() * np.sqrt(252) if excess_returns.std() > 0 else 0
+    info_ratio = excess_mean / excess_std * np.sqrt(252) if excess_std > 0 else 0
     
-    # Beta (regression coefficient)
-    beta = np.cov(strategy_returns, benchmark_returns)[0, 1] / np.var(benchmark_returns) if np.var(benchmark_returns) > 0 else 0
+    # Beta (regression coefficient); sample covariance over population
+    # variance, as computed by the earlier np.cov / np.var formulation
+    covariance = c_sb / (n - 1) if n > 1 else np.nan
+    benchmark_var = m2_b / n if n > 0 else np.nan
+    beta = covariance / benchmark_var if benchmark_var > 0 else 0
     
     # Alpha (intercept)
-    alpha = strategy_returns.mean() - beta * benchmark_returns.mean()
+    alpha = mean_s - beta * mean_b
     alpha_annualized = alpha * 252
     
     # Correlation
-    correlation = np.corrcoef(strategy_returns, benchmark_returns)[0, 1]
+    correlation = c_sb / np.sqrt(m2_s * m2_b) if m2_s * m2_b > 0 else np.nan
     
     # Tracking error
-    tracking_error = excess_returns.std() * np.sqrt(252)
+    tracking_error = excess_std * np.sqrt(252)
     
     return {
         'information_ratio': info_ratio,
@@ -228,11 +306,36 @@ def _calculate_benchmark_metrics(equity_curve: pd.DataFrame,
     }
 
 
+def _rolling_mean_std(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and sample std, via bottleneck or the compiled kernel, else pandas."""
+    # A one-day sample std is undefined; bottleneck can return inf for it
+    if bn is not None and 1 < window <= len(values):
+        return (bn.move_mean(values, window, min_count=window),
+                bn.move_std(values, window, min_count=window, ddof=1))
+    if NUMBA_AVAILABLE:
+        return rolling_mean_std(values, window)
+    # Uncompiled, the kernel is an interpreted loop; pandas' rolling is not
+    rolling = pd.Series(values).rolling(window)
+    return rolling.mean().to_numpy(), rolling.std().to_numpy()
+
+
+def _rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling maximum, via bottleneck or the compiled kernel, else pandas."""
+    if bn is not None and window <= len(values):
+        return bn.move_max(values, window, min_count=window)
+    if NUMBA_AVAILABLE:
+        return rolling_max(values, window)
+    return pd.Series(values).rolling(window).max().to_numpy()
+
+
 def calculate_rolling_metrics(equity_curve: pd.DataFrame, 
                             window: int = 252) -> pd.DataFrame:
     """
     Calculate rolling performance metrics.
     
+    Windows are evaluated with O(N) moving-window routines on plain arrays,
+    and the result is assembled into a DataFrame once at the end.
+    
     Args:
         equity_curve: DataFrame with Date index and Total_PL column
         window: Rolling window size in days
@@ -240,24 +343,31 @@ def calculate_rolling_metrics(equity_curve: pd.DataFrame,
     Returns:
         DataFrame with rolling metrics
     """
-    daily_returns = equity_curve['Daily_Change'].dropna()
+    if window < 1:
+        raise ValueError("window must be at least 1")
     
-    # Rolling volatility
-    rolling_vol = daily_returns.rolling(window=window).std() * np.sqrt(252)
+    daily_changes = equity_curve['Daily_Change'].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(daily_changes)
+    returns_index = equity_curve.index[valid]
+    cumulative = equity_curve['Total_PL'].cumsum().to_numpy(dtype=np.float64)
     
-    # Rolling Sharpe ratio
-    rolling_mean = daily_returns.rolling(window=window).mean()
-    rolling_sharpe = (rolling_mean / rolling_vol) * np.sqrt(252)
+    rolling_mean, rolling_std = _rolling_mean_std(daily_changes[valid], window)
+    window_max = _rolling_max(cumulative, window)
     
-    # Rolling drawdown
-    cumulative = equity_curve['Total_PL'].cumsum()
-    rolling_max = cumulative.rolling(window=window).max()
-    rolling_dd = (cumulative - rolling_max) / rolling_max * 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Rolling volatility
+        rolling_vol = rolling_std * np.sqrt(252)
+        
+        # Rolling Sharpe ratio
+        rolling_sharpe = (rolling_mean / rolling_vol) * np.sqrt(252)
+        
+        # Rolling drawdown
+        rolling_dd = (cumulative - window_max) / window_max * 100
     
     rolling_metrics = pd.DataFrame({
-        'rolling_volatility': rolling_vol,
-        'rolling_sharpe': rolling_sharpe,
-        'rolling_drawdown': rolling_dd
+        'rolling_volatility': pd.Series(rolling_vol, index=returns_index),
+        'rolling_sharpe': pd.Series(rolling_sharpe, index=returns_index),
+        'rolling_drawdown': pd.Series(rolling_dd, index=equity_curve.index)
     })
     
     return rolling_metrics
@@ -86,6 +86,315 @@ def test_stock_position():
         print(f"✗ Stock position test failed: {e}")
         return False
 
+def test_backtest_engine():
+    """Test a full backtest run over the demo configuration."""
+    from backtester.engine import BacktestEngine
+    
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo_config.json")
+    engine = BacktestEngine(config_path)
+    results = engine.run_backtest()
+    
+    # Columns must be internally consistent
+    total = results['Stock_PL'] + results['Option_PL']
+    consistent = (abs(results['Total_PL'] - total).max() < 1e-6 and
+                  abs(results['Daily_Change'].cumsum() - results['Total_PL']).max() < 1e-6)
+    
+    assert consistent, "P/L columns are inconsistent"
+    assert not results.isna().any().any(), "results contain NaN"
+    
+    # A window ending before expiry marks the legs to model on its last day
+    # instead of settling them at intrinsic value
+    import json
+    import tempfile
+    with open(config_path) as f:
+        config = json.load(f)
+    config['end_date'] = "2024-03-01"
+    for leg in config['legs']:
+        leg['strike'] = 100.5
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(config, f)
+    try:
+        truncated = BacktestEngine(f.name)
+        last = truncated.run_backtest().iloc[-1]
+    finally:
+        os.remove(f.name)
+    
+    last_date = truncated._stock_data.index[-1]
+    spot = truncated._stock_data['Adj_Close'].iloc[-1]
+    vol = truncated.data_manager.calculate_historical_volatility(truncated._stock_data).iloc[-1]
+    expected = sum(option.calculate_mtm_value(spot, (option.expiry - last_date).days / 365.0, vol, 0.02)
+                   - option._mult * abs(option.premium)
+                   for option in truncated.option_positions)
+    assert abs(last['Option_PL'] - expected) < 1e-6, f"{last['Option_PL']} != {expected}"
+    
+    print(f"✓ Backtest engine test passed")
+    print(f"  Final P/L: ${results['Total_PL'].iloc[-1]:.2f} over {len(results)} days")
+    
+    return True
+
+def test_pricing_kernel():
+    """Test the compiled mark-to-market kernel against the NumPy pricer."""
+    import numpy as np
+    from backtester._kernels import bs_mtm, bs_mtm_const_rq, bs_price_chain
+    from backtester.instruments import OptionPosition, black_scholes_price_batch
+    
+    n_days = 50
+    prices = np.linspace(80.0, 120.0, n_days)
+    strikes = np.array([90.0, 100.0, 110.0, 100.0])
+    is_call = np.array([True, True, False, False])
+    Ts = np.linspace(0.5, 0.0, n_days)[:, None].repeat(len(strikes), axis=1)
+    rs = np.full(n_days, 0.03)
+    vols = np.linspace(0.15, 0.45, n_days)
+    ones = np.ones(len(strikes))
+    
+    values = bs_mtm(prices, strikes, Ts, rs, 0.01, vols, is_call, ones, ones,
+                    np.empty(Ts.shape))
+    expected = black_scholes_price_batch(prices[:, None], strikes[None, :], Ts, vols[:, None],
+                                         rs[:, None], 0.01, is_call[None, :])
+    const_values = bs_mtm_const_rq(prices, strikes, Ts, 0.03, 0.01, vols, is_call, ones,
+                                   ones, np.empty(Ts.shape))
+    chain = np.broadcast_arrays(prices[:, None], strikes[None, :], Ts, vols[:, None],
+                                rs[:, None], 0.01, is_call[None, :])
+    chain_values = bs_price_chain(*(np.ascontiguousarray(x).ravel() for x in chain),
+                                  np.empty(Ts.size)).reshape(Ts.shape)
+    max_error = max(np.abs(values - expected).max(), np.abs(const_values - expected).max(),
+                    np.abs(chain_values - expected).max())
+    
+    assert max_error < 1e-8, f"max deviation {max_error:.2e}"
+    
+    # Scalar quotes at a zero spot match the batch pricer: 0 for a call, K*exp(-rT) for a put
+    for option_type, is_call_leg in (("call", True), ("put", False)):
+        option = OptionPosition("long", option_type, 100.0, 1.0, 1, "2024-01-01", "2024-07-01")
+        scalar = option.black_scholes_price(0.0, 0.5, 0.2, 0.03)
+        batch = black_scholes_price_batch(0.0, 100.0, 0.5, 0.2, 0.03, 0.0, is_call_leg)
+        assert abs(scalar - batch) < 1e-12, (option_type, scalar, float(batch))
+    
+    print(f"✓ Pricing kernel test passed")
+    print(f"  Max deviation from NumPy pricer: {max_error:.2e}")
+    
+    return True
+
+def test_greeks():
+    """Test fused greeks against finite differences of the price."""
+    import numpy as np
+    from backtester.instruments import (OptionPosition, black_scholes_greeks_batch,
+                                        black_scholes_price_batch)
+    
+    S = np.array([90.0, 100.0, 110.0, 100.0])
+    K = np.array([100.0, 100.0, 100.0, 95.0])
+    is_call = np.array([True, False, True, False])
+    T, sigma, r, q = 0.5, 0.25, 0.03, 0.01
+    h = 1e-4
+    
+    greeks = black_scholes_greeks_batch(S, K, T, sigma, r, q, is_call)
+    price = lambda S=S, T=T, sigma=sigma: black_scholes_price_batch(S, K, T, sigma, r, q, is_call)
+    fd = {
+        'price': price(),
+        'delta': (price(S=S + h) - price(S=S - h)) / (2 * h),
+        'gamma': (price(S=S + h) - 2 * price() + price(S=S - h)) / h**2,
+        'vega': (price(sigma=sigma + h) - price(sigma=sigma - h)) / (2 * h),
+        'theta': -(price(T=T + h) - price(T=T - h)) / (2 * h),
+    }
+    max_error = max(np.abs(greeks[name] - fd[name]).max() for name in fd)
+    
+    # Scalar quotes take the compiled path and must agree with the batch
+    option = OptionPosition("short", "put", 95.0, -2.0, 1, "2024-01-01", "2024-07-01")
+    scalar = option.black_scholes_price_and_greeks(100.0, T, sigma, r, q)
+    max_error = max(max_error, max(abs(scalar[name] - greeks[name][3]) for name in fd))
+    
+    # A zero spot gives the batch's inf/NaN greeks instead of raising
+    at_zero = option.black_scholes_price_and_greeks(0.0, T, sigma, r, q)
+    batch_zero = black_scholes_greeks_batch(0.0, 95.0, T, sigma, r, q, False)
+    assert all(np.allclose(at_zero[name], batch_zero[name], equal_nan=True) for name in fd), at_zero
+    
+    assert max_error < 1e-4, f"max deviation {max_error:.2e}"
+    
+    print(f"✓ Greeks test passed")
+    print(f"  Max deviation from finite differences: {max_error:.2e}")
+    
+    return True
+
+def test_option_book():
+    """Test that the option book prices like its individual positions."""
+    import pandas as pd
+    from backtester.instruments import OptionBook, OptionPosition
+    
+    # Start small so adding legs exercises the capacity doubling
+    book = OptionBook(capacity=1)
+    options = [
+        OptionPosition("long", "put", 95.0, 3.0, 2, "2024-01-02", "2024-06-21"),
+        OptionPosition("short", "call", 110.0, -2.5, 1, "2024-01-02", "2024-03-15"),
+        OptionPosition("long", "call", 100.0, 6.0, 3, "2024-01-02", "2024-09-20"),
+    ]
+    for option in options:
+        book.add(option)
+    options[1].exercise()
+    
+    current_date = pd.Timestamp("2024-02-01")
+    book_value = book.mtm_value(104.0, current_date, 0.25, 0.03)
+    expected = sum(option.calculate_mtm_value(104.0, (option.expiry - current_date).days / 365.0,
+                                              0.25, 0.03)
+                   for option in options)
+    
+    # Batch exercise check agrees with the per-position one
+    expiry = pd.Timestamp("2024-06-21")
+    exercised, exercise_value = book.check_exercise(expiry, 90.0)
+    checks = [option.check_exercise(expiry, 90.0) for option in options]
+    
+    assert len(book) == 3
+    assert abs(book_value - expected) < 1e-8, f"book value {book_value} != {expected}"
+    assert list(exercised) == [done for done, _ in checks]
+    assert exercise_value == sum(value for _, value in checks)
+    
+    print(f"✓ Option book test passed")
+    print(f"  Book value: ${book_value:,.2f}")
+    
+    return True
+
+def test_drawdown_metrics():
+    """Test drawdown statistics on a hand-checked P/L series."""
+    import pandas as pd
+    from backtester.metrics import calculate_metrics
+    
+    # Cumulative equity 10, 5, 2, 12, -8, -3 against peaks 10, 10, 10, 12, 12, 12
+    equity_curve = pd.DataFrame({
+        'Total_PL': [10.0, -5.0, -3.0, 10.0, -20.0, 5.0],
+        'Daily_Change': [10.0, -15.0, 2.0, 13.0, -30.0, 25.0],
+    }, index=pd.bdate_range("2024-01-01", periods=6))
+    
+    metrics = calculate_metrics(equity_curve)
+    periods = metrics['drawdown_periods'].to_records()
+    
+    assert abs(metrics['max_drawdown'] + 2000 / 12) < 1e-9
+    assert [(p['start_date'].day, p['end_date'].day) for p in periods] == [(2, 4), (5, 8)]
+    assert abs(periods[0]['max_drawdown'] + 80) < 1e-9
+    assert metrics['recovery_time_days'] == -1  # never back at 12
+    
+    # Equity 10, 5, 2, 3, 4, 10: trough on Wednesday, back at the peak on Monday
+    recovered = calculate_metrics(pd.DataFrame({
+        'Total_PL': [10.0, -5.0, -3.0, 1.0, 1.0, 6.0],
+        'Daily_Change': [10.0, -5.0, -3.0, 1.0, 1.0, 6.0],
+    }, index=pd.bdate_range("2024-01-01", periods=6)))
+    assert recovered['recovery_time_days'] == 5
+    
+    print(f"✓ Drawdown metrics test passed")
+    print(f"  Max drawdown: {metrics['max_drawdown']:.2f}% over {len(periods)} periods")
+    
+    return True
+
+def test_rolling_metrics():
+    """Test the online rolling-window kernels against pandas."""
+    import numpy as np
+    import pandas as pd
+    from backtester._kernels import rolling_max, rolling_mean_std
+    
+    values = pd.Series(np.sin(np.arange(200) / 7.0) * 10 + np.arange(200) * 0.1)
+    values.iloc[[50, 120]] = np.nan
+    window = 20
+    
+    mean, std = rolling_mean_std(values.to_numpy(), window)
+    expected = [values.rolling(window).mean(), values.rolling(window).std(),
+                values.rolling(window).max()]
+    actual = [mean, std, rolling_max(values.to_numpy(), window)]
+    
+    same_nans = all((np.isnan(a) == e.isna().to_numpy()).all() for a, e in zip(actual, expected))
+    max_error = max(np.nanmax(np.abs(a - e.to_numpy())) for a, e in zip(actual, expected))
+    
+    assert same_nans, "NaN pattern differs from pandas"
+    assert max_error < 1e-9, f"max deviation {max_error:.2e}"
+    
+    print(f"✓ Rolling metrics test passed")
+    print(f"  Max deviation from pandas: {max_error:.2e}")
+    
+    return True
+
+def test_benchmark_metrics():
+    """Test single-pass benchmark statistics against NumPy references."""
+    import numpy as np
+    import pandas as pd
+    from backtester.metrics import calculate_metrics, calculate_metrics_arrays
+    
+    dates = pd.bdate_range("2024-01-01", periods=120)
+    rng = np.random.default_rng(0)
+    benchmark = rng.normal(0.0, 10.0, len(dates))
+    strategy = 0.6 * benchmark + rng.normal(2.0, 5.0, len(dates))
+    equity_curve = pd.DataFrame({'Total_PL': np.cumsum(strategy) + 1000.0,
+                                 'Daily_Change': strategy}, index=dates)
+    benchmark_curve = pd.DataFrame({'Daily_Change': benchmark}, index=dates)
+    
+    metrics = calculate_metrics(equity_curve, benchmark_curve)
+    array_metrics = calculate_metrics_arrays(equity_curve['Total_PL'].to_numpy(), strategy,
+                                             dates.to_numpy(), benchmark)
+    expected_beta = np.cov(strategy, benchmark)[0, 1] / np.var(benchmark)
+    expected_corr = np.corrcoef(strategy, benchmark)[0, 1]
+    expected_te = np.std(strategy - benchmark, ddof=1) * np.sqrt(252)
+    return_pcts = strategy / abs(equity_curve['Total_PL'].iloc[0]) * 100
+    expected_vol = np.std(return_pcts, ddof=1) * np.sqrt(252)
+    
+    assert abs(metrics['beta'] - expected_beta) < 1e-10
+    assert abs(metrics['correlation'] - expected_corr) < 1e-10
+    assert abs(metrics['tracking_error'] - expected_te) < 1e-8
+    assert abs(metrics['volatility'] - expected_vol) < 1e-8
+    assert array_metrics['beta'] == metrics['beta']
+    assert array_metrics['sharpe_ratio'] == metrics['sharpe_ratio']
+    
+    print(f"✓ Benchmark metrics test passed")
+    print(f"  Beta: {metrics['beta']:.3f}, correlation: {metrics['correlation']:.3f}")
+    
+    return True
+
+def test_price_cache():
+    """Test that closed downloads are cached and open-ended or empty ones are not."""
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from backtester import data
+    
+    class StubYF:
+        """Stand-in for yfinance that counts downloads."""
+        calls = 0
+        empty = False
+        
+        def download(self, ticker, start, end, progress=False):
+            StubYF.calls += 1
+            index = pd.bdate_range(start, end)
+            prices = np.full(len(index), np.nan) if StubYF.empty else np.linspace(50.0, 60.0, len(index))
+            return pd.DataFrame({'Adj Close': prices}, index=index)
+    
+    original_yf = data.yf
+    data.yf = StubYF()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            manager = data.DataManager(cache_dir=cache_dir)
+            future = (pd.Timestamp.today() + pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+            
+            # A closed range is downloaded once and then read from the cache
+            first = manager.get_stock_data("TEST", "2024-01-02", "2024-02-01")
+            second = manager.get_stock_data("TEST", "2024-01-02", "2024-02-01")
+            assert first.equals(second)
+            cached = 1 if importlib.util.find_spec("pyarrow") else 0  # parquet needs pyarrow
+            assert StubYF.calls == 2 - cached
+            
+            # A range ending in the future is downloaded again every time
+            StubYF.calls = 0
+            manager.get_stock_data("TEST", "2024-01-02", future)
+            manager.get_stock_data("TEST", "2024-01-02", future)
+            assert StubYF.calls == 2
+            
+            # So is an empty download
+            StubYF.calls = 0
+            StubYF.empty = True
+            manager.get_stock_data("EMPTY", "2024-01-02", "2024-02-01")
+            manager.get_stock_data("EMPTY", "2024-01-02", "2024-02-01")
+            assert StubYF.calls == 2
+            assert len(os.listdir(cache_dir)) == cached
+    finally:
+        data.yf = original_yf
+    
+    print(f"✓ Price cache test passed")
+    
+    return True
+
 def main():
     """Run all tests."""
     print("Testing backtesting package...")
@@ -95,6 +404,14 @@ def main():
         ("Module Imports", test_imports),
         ("Black-Scholes Pricing", test_black_scholes),
         ("Stock Position", test_stock_position),
+        ("Backtest Engine", test_backtest_engine),
+        ("Pricing Kernel", test_pricing_kernel),
+        ("Greeks", test_greeks),
+        ("Option Book", test_option_book),
+        ("Drawdown Metrics", test_drawdown_metrics),
+        ("Rolling Metrics", test_rolling_metrics),
+        ("Benchmark Metrics", test_benchmark_metrics),
+        ("Price Cache", test_price_cache),
     ]
     
     passed = 0
@@ -102,7 +419,13 @@ def main():
     
     for test_name, test_func in tests:
         print(f"\nRunning {test_name} test...")
-        if test_func():
+        # Newer tests assert their checks so pytest enforces them too
+        try:
+            ok = test_func()
+        except Exception as e:
+            print(f"✗ {test_name} test failed: {e!r}")
+            ok = False
+        if ok:
             passed += 1
         else:
             print(f"✗ {test_name} failed")